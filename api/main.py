@@ -1,8 +1,11 @@
 import asyncio
 import base64
+import codecs
 from datetime import datetime
 import glob
 import json
+import locale
+import mmap
 from pathlib import Path
 import re
 import sqlite3
@@ -38,6 +41,9 @@ ocr_url = "https://llmfoundry.straive.com/gemini/v1beta/models/gemini-2.0-flash-
 
 BASE_DIR = Path("/data").resolve()
 
+# The sender lives in the headers; only this much of an email is sent to the LLM.
+EMAIL_CONTENT_LIMIT = 64 * 1024
+
 async def is_file_empty_or_nonexistent(file_path: str) -> bool:
     try:
         async with aiofiles.open(file_path, 'r') as file:
@@ -53,6 +59,27 @@ def validate_path(file_path: str) -> bool:
 def is_directory_exists(directory_path: str) -> bool:
     return os.path.exists(Path(directory_path).resolve())
 
+# Lines end in \n, \r\n or a bare \r, as in text mode, and are decoded with the
+# same locale encoding open() would use.
+def iter_mapped_lines(file_path: str):
+    encoding = locale.getpreferredencoding(False)
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw_line in iter(mm.readline, b""):
+                for line in raw_line.splitlines():
+                    yield line.decode(encoding)
+
+def read_mapped_head(file_path: str, limit: int) -> str:
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))()
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Not final: a character cut in half at the limit is dropped.
+            return decoder.decode(mm[:limit])
+
 async def identify_task(task: str) -> dict:
     try:
 
@@ -136,6 +163,9 @@ def parse_date(date_str):
             continue
     return None
 
+def count_weekday(input_file_path: str, weekday: int) -> int:
+    return sum(1 for date in iter_mapped_lines(input_file_path) if (parsed_date := parse_date(date)) and parsed_date.weekday() == weekday)
+
 async def count_specific_day(input_file_path: str, output_file_path: str, day_to_count: str):
 
     if not validate_path(input_file_path) or not validate_path(output_file_path):
@@ -164,16 +194,11 @@ async def count_specific_day(input_file_path: str, output_file_path: str, day_to
         raise HTTPException(status_code=400, detail="Bad Request response: Invalid day")
 
     try:
-        async with aiofiles.open(input_file_path, 'r') as f:
-            content = await f.read()
-        dates = content.splitlines()
+        day_count = await asyncio.to_thread(count_weekday, input_file_path, day_mapping[day_to_count])
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"File not found at {input_file_path}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid input file '{input_file_path}': {str(e)}")
-    
-    
-    day_count = sum(1 for date in dates if (parsed_date := parse_date(date)) and parsed_date.weekday() == day_mapping[day_to_count])
 
     
     async with aiofiles.open(output_file_path, 'w') as f:
@@ -349,11 +374,10 @@ async def extract_email_sender(input_file_path: str, output_file_path):
         raise HTTPException(status_code=400, detail="Overwriting file is not allowed. Use a different name for the output file") 
 
     try:
-        async with aiofiles.open(input_file_path, 'r') as file:
-            try:
-                email_content = await file.read()
-            except FileNotFoundError:
-                raise HTTPException(status_code=404, detail=f"File not found at {input_file_path}")
+        try:
+            email_content = await asyncio.to_thread(read_mapped_head, input_file_path, EMAIL_CONTENT_LIMIT)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"File not found at {input_file_path}")
 
         messages=[
                 {"role": "system", "content": "You are a helpful assistant. extract only the sender/from email address(eg., name@xmail.com, yyyy@gmail.com), from the given email"},
@@ -528,11 +552,10 @@ async def find_similar_comments(input_file_path: str, output_file_path):
     if not is_valid_output_file :
         raise HTTPException(status_code=400, detail="Overwriting file is not allowed. Use a different name for the output file")
     try:
-        async with aiofiles.open(input_file_path, mode='r') as f:
-            try:
-                lines = await f.readlines()
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"invalid input filename")           
+        try:
+            lines = await asyncio.to_thread(lambda: [line for line in iter_mapped_lines(input_file_path) if line.strip()])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"invalid input filename")
             
         embeddings_np = await get_embeddings(lines)
                